@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Пакетная трансляция Python2 → Python3 без графического интерфейса
+
+Использование:
+    python batch.py <файл или каталог> [-o каталог_вывода]
+    pypy3 batch.py examples_py2/ -o out/
+"""
+
+import argparse
+import os
+import sys
+import tokenize
+from typing import List, Optional, Tuple
+
+from lexer import Lexer
+from parser import Parser
+from optimizer import Optimizer
+from code_generator import CodeGenerator
+
+
+def collect_sources(path: str, skip_dir: Optional[str] = None) -> List[str]:
+    """Собрать список .py файлов (рекурсивно для каталога, кроме skip_dir)"""
+    if os.path.isfile(path):
+        return [path]
+    skip = os.path.realpath(skip_dir) if skip_dir else None
+    sources = []
+    for root, dirs, files in os.walk(path):
+        # Каталог результатов внутри входного не обходится повторно
+        dirs[:] = sorted(d for d in dirs
+                         if os.path.realpath(os.path.join(root, d)) != skip)
+        for name in sorted(files):
+            if name.endswith('.py'):
+                sources.append(os.path.join(root, name))
+    return sources
+
+
+def translate_file(src_path: str, dst_path: str, optimizer: Optimizer,
+                   generator: CodeGenerator) -> List[str]:
+    """Перевести один файл. Возвращает список ошибок (пустой при успехе)"""
+    # tokenize.open учитывает объявление кодировки (PEP 263), по умолчанию utf-8
+    with tokenize.open(src_path) as f:
+        source = f.read()
+
+    lexer = Lexer(source)
+    tokens = lexer.scan()
+    if lexer.errors:
+        return lexer.errors
+
+    parser = Parser(tokens)
+    ast = parser.parse()
+    if parser.errors:
+        return parser.errors
+
+    ast = optimizer.optimize(ast)
+    with open(dst_path, 'w', encoding='utf-8') as f:
+        generator.generate_to(ast, f)
+        f.write("\n")
+    return []
+
+
+def translate_all(sources: List[str], base: str, out_dir: str) -> Tuple[int, int]:
+    """
+    Перевести все файлы одним циклом.
+    Оптимизатор и генератор создаются один раз: под PyPy горячие
+    методы успевают прогреться JIT-компилятором.
+    """
+    optimizer = Optimizer()
+    generator = CodeGenerator()
+    ok = failed = 0
+    for src_path in sources:
+        dst_path = os.path.join(out_dir, os.path.relpath(src_path, base))
+        try:
+            os.makedirs(os.path.dirname(dst_path) or '.', exist_ok=True)
+            errors = translate_file(src_path, dst_path, optimizer, generator)
+        except (OSError, UnicodeDecodeError, SyntaxError) as e:
+            # Нечитаемый файл (кодировка, права, неверное объявление
+            # кодировки) пропускается, остальные файлы обрабатываются
+            errors = [f"{type(e).__name__}: {e}"]
+        if errors:
+            failed += 1
+            print(f"✗ {src_path}", file=sys.stderr)
+            for error in errors:
+                print(f"  • {error}", file=sys.stderr)
+        else:
+            ok += 1
+    return ok, failed
+
+
+def main(argv: List[str] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Пакетная трансляция Python2 → Python3")
+    arg_parser.add_argument('input', help="исходный файл или каталог")
+    arg_parser.add_argument('-o', '--output', default='py3_output',
+                            help="каталог для результата (по умолчанию py3_output)")
+    args = arg_parser.parse_args(argv)
+
+    sources = collect_sources(args.input, args.output)
+    if not sources:
+        print(f"Нет файлов для трансляции: {args.input}", file=sys.stderr)
+        return 1
+
+    base = args.input if os.path.isdir(args.input) else os.path.dirname(args.input)
+    ok, failed = translate_all(sources, base, args.output)
+    print(f"Переведено: {ok}, с ошибками: {failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,310 +19,478 @@
 """
 
 from parser.ast_nodes import *
-from typing import List, Set
+from parser.parser import Pass, Break, Continue
+from typing import Dict, List, TextIO
+
+
+class _WriterSink:
+    """
+    Приёмник строк кода, пишущий сразу в файловый объект.
+    Повторяет интерфейс списка, используемый генератором (append, extend, len),
+    и разделяет строки так же, как "\\n".join.
+    """
+    
+    __slots__ = ('_write', '_count')
+    
+    def __init__(self, stream: TextIO):
+        self._write = stream.write
+        self._count = 0
+    
+    def append(self, line: str) -> None:
+        """Записать строку (с разделителем перед всеми, кроме первой)"""
+        if self._count:
+            self._write("\n")
+        self._write(line)
+        self._count += 1
+    
+    def extend(self, lines: List[str]) -> None:
+        """Записать несколько строк"""
+        for line in lines:
+            self.append(line)
+    
+    def __len__(self) -> int:
+        """Количество записанных строк"""
+        return self._count
 
 
 class CodeGenerator:
     """Генератор Python3 кода из AST с полной трансляцией Python 2->3"""
     
+    # Атрибуты экземпляра фиксированы: новые кэши нужно добавлять сюда
+    __slots__ = (
+        'indent_level', 'indent_str', '_indents', '_cur_indent', '_const_lines',
+        '_needs_functools',
+    )
+    
+    # Множество известных функций/методов Python 2
+    _PY2_FUNCTIONS = frozenset({'xrange', 'raw_input', 'reload', 'reduce', 'unicode', 'basestring'})
+    _PY2_METHODS = frozenset({'iteritems', 'iterkeys', 'itervalues', 'has_key'})
+    
+    # Переименования имён Python 2 -> Python 3
+    _PY2_RENAMES = {
+        'xrange': 'range',
+        'raw_input': 'input',
+        'unicode': 'str',
+        'unichr': 'chr',
+        'long': 'int',
+    }
+    # Для вызываемых имён дополнительно reduce -> functools.reduce
+    _PY2_CALL_RENAMES = dict(_PY2_RENAMES, reduce='functools.reduce')
+    # Операторы Python 2 без аналога в Python 3
+    _PY2_OPERATORS = {'<>': '!='}
+    
+    # Таблица экранирования строковых литералов (для двойных кавычек):
+    # обратная косая черта, кавычка и управляющие символы
+    _STRING_ESCAPES = str.maketrans({
+        **{chr(code): f"\\x{code:02x}" for code in (*range(32), 127)},
+        '\\': '\\\\',
+        '"': '\\"',
+        '\n': '\\n',
+        '\r': '\\r',
+        '\t': '\\t',
+    })
+    
+    # Инструкции из одного ключевого слова
+    _KEYWORD_STATEMENTS = {Pass: 'pass', Break: 'break', Continue: 'continue'}
+    
     def __init__(self):
         self.indent_level = 0
         self.indent_str = "    "  # 4 пробела
-        
-        # Множество известных функций/методов Python 2
-        self.py2_functions = {'xrange', 'raw_input', 'reload', 'reduce', 'unicode', 'basestring'}
-        self.py2_methods = {'iteritems', 'iterkeys', 'itervalues', 'has_key'}
+        # Кэш строк отступа по уровням (расширяется по необходимости)
+        self._indents: List[str] = [self.indent_str * i for i in range(32)]
+        # Отступ текущего уровня; обновляется вместе с indent_level
+        self._cur_indent = ""
+        # Кэш частых неизменных строк по уровням отступа: текст -> {уровень: строка}
+        self._const_lines: Dict[str, Dict[int, str]] = {
+            'pass': {}, 'else:': {}, 'return': {}, 'print()': {},
+            'break': {}, 'continue': {},
+        }
+        
+        # Встретился ли вызов, требующий import functools (reduce)
+        self._needs_functools = False
     
     def generate(self, ast: ASTNode) -> str:
         """Генерировать Python3 код из AST"""
         if isinstance(ast, Program):
-            return self._generate_program(ast)
+            out: List[str] = []
+            self._generate_program(ast, out)
+            return "\n".join(out)
         return ""
     
+    def generate_to(self, ast: ASTNode, stream: TextIO) -> None:
+        """
+        Генерировать Python3 код из AST с записью в поток (файл, StringIO).
+        Строки пишутся по мере генерации, без сборки всего текста в памяти.
+        """
+        if isinstance(ast, Program):
+            self._generate_program(ast, _WriterSink(stream))
+    
     def _indent(self) -> str:
         """Текущий отступ"""
-        return self.indent_str * self.indent_level
+        level = self.indent_level
+        indents = self._indents
+        if level >= len(indents):
+            indents.extend(self.indent_str * i for i in range(len(indents), level + 1))
+        return indents[level]
     
-    def _generate_program(self, node: Program) -> str:
-        """Генерация программы"""
-        lines = []
+    def _const_line(self, text: str) -> str:
+        """Неизменная строка (pass, break, else:, ...) с текущим отступом"""
+        by_level = self._const_lines[text]
+        line = by_level.get(self.indent_level)
+        if line is None:
+            line = by_level[self.indent_level] = self._indent() + text
+        return line
+    
+    def _generate_program(self, node: Program, out: List[str]) -> None:
+        """
+        Генерация программы.
+        Инструкции верхнего уровня генерируются по одной: как только
+        в инструкции встретился reduce, перед ней выводится import functools
+        (флаг ставится во время генерации, без отдельного обхода дерева).
+        """
+        self._needs_functools = False
+        functools_imported = False
+        chunk: List[str] = []
         for stmt in node.body:
-            code = self._generate_statement(stmt)
-            if code:
-                lines.append(code)
-        return "\n".join(lines) if lines else "pass"
-    
-    def _generate_statement(self, node: ASTNode) -> str:
-        """Генерация инструкции"""
-        if isinstance(node, FunctionDef):
-            return self._generate_function_def(node)
-        
-        if isinstance(node, ClassDef):
-            return self._generate_class_def(node)
-        
-        if isinstance(node, If):
-            return self._generate_if(node)
-        
-        if isinstance(node, While):
-            return self._generate_while(node)
-        
-        if isinstance(node, For):
-            return self._generate_for(node)
-        
-        if isinstance(node, Print):
-            return self._generate_print(node)
-        
-        if isinstance(node, Return):
-            return self._generate_return(node)
-        
-        if isinstance(node, Import):
-            return self._generate_import(node)
-        
-        if isinstance(node, ImportFrom):
-            return self._generate_import_from(node)
-        
-        if isinstance(node, Assign):
-            return self._generate_assign(node)
-        
-        # Выражение как инструкция
-        expr_code = self._generate_expression(node)
-        if expr_code:
-            return self._indent() + expr_code
-        return ""
+            self._generate_statements([stmt], chunk)
+            if self._needs_functools and not functools_imported:
+                out.append("import functools")
+                functools_imported = True
+            out.extend(chunk)
+            chunk.clear()
+        if not out:
+            out.append("pass")
+    
+    def _generate_statements(self, body: List[ASTNode], out: List[str]) -> None:
+        """
+        Генерация последовательности инструкций без рекурсии.
+        
+        Стек работ содержит пары (уровень отступа, элемент), где элемент -
+        готовая строка (str), тело вложенного блока (list), итератор по
+        ещё не обработанным инструкциям блока или отметка конца блока
+        (int - число строк в out до начала блока). Подряд идущие простые
+        инструкции генерируются в одном цикле, без прохода через стек;
+        составная инструкция возвращает свои части по порядку (строки
+        заголовков и тела блоков), и они кладутся в стек поверх остатка блока.
+        """
+        base_level = self.indent_level
+        self._cur_indent = self._indent()
+        stmt_handlers = self._STMT_HANDLERS
+        expr_types = self._EXPR_STMT_TYPES
+        generate_expression = self._generate_expression
+        append = out.append
+        work = [(base_level, iter(body))]
+        pop = work.pop
+        push = work.append
+        
+        while work:
+            level, item = pop()
+            if level != self.indent_level:
+                self.indent_level = level
+                self._cur_indent = self._indent()
+            item_type = type(item)
+            
+            if item_type is str:
+                append(item)
+                continue
+            
+            if item_type is int:
+                # Конец блока: если блок не дал ни одной строки (пустое тело
+                # или только пустые вложенные Program), выводится pass
+                if len(out) == item:
+                    append(self._const_line('pass'))
+                continue
+            
+            if item_type is list:
+                # Отметка конца блока ляжет в стек под его инструкциями
+                push((level, len(out)))
+                item = iter(item)
+            
+            for stmt in item:
+                handler = stmt_handlers.get(type(stmt))
+                if handler is None:
+                    handler = self._find_handler(stmt_handlers, stmt)
+                if handler is None:
+                    # Выражение как инструкция; прочие узлы не генерируются
+                    if isinstance(stmt, expr_types):
+                        expr_code = generate_expression(stmt)
+                        if expr_code:
+                            append(self._cur_indent + expr_code)
+                    continue
+                
+                parts = handler(self, stmt, out)
+                if parts:
+                    # Остаток блока продолжится после частей составной инструкции
+                    push((level, item))
+                    for part in reversed(parts):
+                        push((level + 1 if type(part) is list else level, part))
+                    break
+        
+        self.indent_level = base_level
+        self._cur_indent = self._indent()
+    
+    def _generate_block(self, node: Program, out: List[str]) -> list:
+        """
+        Вложенный Program (оптимизатор заменяет им if с константным
+        условием): инструкции выводятся на текущем уровне отступа
+        """
+        return [iter(node.body)]
     
-    def _generate_function_def(self, node: FunctionDef) -> str:
+    def _generate_keyword(self, node: ASTNode, out: List[str]) -> None:
+        """Генерация pass/break/continue"""
+        out.append(self._const_line(self._KEYWORD_STATEMENTS[type(node)]))
+    
+    def _generate_function_def(self, node: FunctionDef, out: List[str]) -> list:
         """Генерация определения функции"""
         params = ", ".join(node.params)
-        lines = [f"{self._indent()}def {node.name}({params}):"]
-        
-        self.indent_level += 1
-        
-        if not node.body:
-            lines.append(f"{self._indent()}pass")
-        else:
-            for stmt in node.body:
-                code = self._generate_statement(stmt)
-                if code:
-                    lines.append(code)
-        
-        self.indent_level -= 1
-        
-        return "\n".join(lines)
+        return [f"{self._cur_indent}def {node.name}({params}):", node.body]
     
-    def _generate_class_def(self, node: ClassDef) -> str:
+    def _generate_class_def(self, node: ClassDef, out: List[str]) -> list:
         """Генерация определения класса"""
         bases = f"({', '.join(node.bases)})" if node.bases else ""
-        lines = [f"{self._indent()}class {node.name}{bases}:"]
-        
-        self.indent_level += 1
-        
-        if not node.body:
-            lines.append(f"{self._indent()}pass")
-        else:
-            for stmt in node.body:
-                code = self._generate_statement(stmt)
-                if code:
-                    lines.append(code)
-        
-        self.indent_level -= 1
-        
-        return "\n".join(lines)
+        return [f"{self._cur_indent}class {node.name}{bases}:", node.body]
     
-    def _generate_if(self, node: If) -> str:
+    def _generate_if(self, node: If, out: List[str]) -> list:
         """Генерация if/elif/else"""
-        lines = []
+        indent = self._cur_indent
+        gen = self._generate_expression
         
         # if
-        condition = self._generate_expression(node.condition)
-        lines.append(f"{self._indent()}if {condition}:")
-        
-        self.indent_level += 1
-        if not node.then_body:
-            lines.append(f"{self._indent()}pass")
-        else:
-            for stmt in node.then_body:
-                code = self._generate_statement(stmt)
-                if code:
-                    lines.append(code)
-        self.indent_level -= 1
+        condition = gen(node.condition)
+        parts = [f"{indent}if {condition}:", node.then_body]
         
         # elif
         for elif_cond, elif_body in node.elif_blocks:
-            condition = self._generate_expression(elif_cond)
-            lines.append(f"{self._indent()}elif {condition}:")
-            
-            self.indent_level += 1
-            if not elif_body:
-                lines.append(f"{self._indent()}pass")
-            else:
-                for stmt in elif_body:
-                    code = self._generate_statement(stmt)
-                    if code:
-                        lines.append(code)
-            self.indent_level -= 1
+            condition = gen(elif_cond)
+            parts.append(f"{indent}elif {condition}:")
+            parts.append(elif_body)
         
         # else
         if node.else_body:
-            lines.append(f"{self._indent()}else:")
-            
-            self.indent_level += 1
-            for stmt in node.else_body:
-                code = self._generate_statement(stmt)
-                if code:
-                    lines.append(code)
-            self.indent_level -= 1
+            parts.append(self._const_line('else:'))
+            parts.append(node.else_body)
         
-        return "\n".join(lines)
+        return parts
     
-    def _generate_while(self, node: While) -> str:
+    def _generate_while(self, node: While, out: List[str]) -> list:
         """Генерация цикла while"""
         condition = self._generate_expression(node.condition)
-        lines = [f"{self._indent()}while {condition}:"]
-        
-        self.indent_level += 1
-        if not node.body:
-            lines.append(f"{self._indent()}pass")
-        else:
-            for stmt in node.body:
-                code = self._generate_statement(stmt)
-                if code:
-                    lines.append(code)
-        self.indent_level -= 1
-        
-        return "\n".join(lines)
+        return [f"{self._cur_indent}while {condition}:", node.body]
     
-    def _generate_for(self, node: For) -> str:
+    def _generate_for(self, node: For, out: List[str]) -> list:
         """Генерация цикла for"""
         target = self._generate_expression(node.target)
+        # xrange -> range выполняется таблицей переименований
         iter_expr = self._generate_expression(node.iter)
         
-        # Преобразование xrange -> range
-        if isinstance(node.iter, Call):
-            if isinstance(node.iter.func, Name) and node.iter.func.id == 'xrange':
-                iter_expr = self._generate_expression(
-                    Call(func=Name(id='range', line=0, column=0), 
-                         args=node.iter.args, line=0, column=0)
-                )
-        
-        lines = [f"{self._indent()}for {target} in {iter_expr}:"]
-        
-        self.indent_level += 1
-        if not node.body:
-            lines.append(f"{self._indent()}pass")
-        else:
-            for stmt in node.body:
-                code = self._generate_statement(stmt)
-                if code:
-                    lines.append(code)
-        self.indent_level -= 1
-        
-        return "\n".join(lines)
+        return [f"{self._cur_indent}for {target} in {iter_expr}:", node.body]
     
-    def _generate_print(self, node: Print) -> str:
+    def _generate_print(self, node: Print, out: List[str]) -> None:
         """Генерация print (Python 2 statement -> Python 3 function)"""
         if not node.args:
             # print с пустыми аргументами
-            return f"{self._indent()}print()"
+            out.append(self._const_line('print()'))
+            return
         
-        args = ", ".join([self._generate_expression(arg) for arg in node.args])
+        gen = self._generate_expression
+        args = ", ".join([gen(arg) for arg in node.args])
         
         # Преобразование Python2 print в Python3 print()
         if node.newline:
-            return f"{self._indent()}print({args})"
+            out.append(f"{self._cur_indent}print({args})")
         else:
             # запятая в конце = без \n (Python 2) -> end='' (Python 3)
-            return f"{self._indent()}print({args}, end='')"
+            out.append(f"{self._cur_indent}print({args}, end='')")
     
-    def _generate_return(self, node: Return) -> str:
+    def _generate_return(self, node: Return, out: List[str]) -> None:
         """Генерация return"""
         if node.value:
             value = self._generate_expression(node.value)
-            return f"{self._indent()}return {value}"
-        return f"{self._indent()}return"
+            out.append(f"{self._cur_indent}return {value}")
+        else:
+            out.append(self._const_line('return'))
     
-    def _generate_import(self, node: Import) -> str:
+    def _generate_import(self, node: Import, out: List[str]) -> None:
         """Генерация import"""
         modules = ", ".join(node.modules)
-        return f"{self._indent()}import {modules}"
+        out.append(f"{self._cur_indent}import {modules}")
     
-    def _generate_import_from(self, node: ImportFrom) -> str:
+    def _generate_import_from(self, node: ImportFrom, out: List[str]) -> None:
         """Генерация from ... import ..."""
         names = ", ".join(node.names)
-        return f"{self._indent()}from {node.module} import {names}"
+        out.append(f"{self._cur_indent}from {node.module} import {names}")
     
-    def _generate_assign(self, node: Assign) -> str:
+    def _generate_assign(self, node: Assign, out: List[str]) -> None:
         """Генерация присваивания"""
         target = self._generate_expression(node.target)
         value = self._generate_expression(node.value)
-        return f"{self._indent()}{target} = {value}"
+        out.append(f"{self._cur_indent}{target} = {value}")
+    
+    @staticmethod
+    def _find_handler(handlers: dict, node: ASTNode):
+        """Поиск обработчика для подклассов узлов (медленный путь)"""
+        for node_type, handler in handlers.items():
+            if isinstance(node, node_type):
+                return handler
+        return None
     
     def _generate_expression(self, node: ASTNode) -> str:
-        """Генерация выражения"""
+        """
+        Генерация выражения без рекурсии (обход в обратном порядке).
+        
+        Составной узел посещается дважды: сначала в стек кладутся его дети,
+        затем их результаты снимаются со стека результатов и собираются.
+        """
         if node is None:
             return ""
         
-        if isinstance(node, Name):
-            # Преобразование xrange -> range
-            if node.id == 'xrange':
-                return 'range'
-            # Преобразование raw_input -> input
-            if node.id == 'raw_input':
-                return 'input'
-            # Преобразование unicode -> str
-            if node.id == 'unicode':
-                return 'str'
-            # Преобразование long -> int (отдалённо)
-            if node.id == 'long':
-                return 'int'
-            return node.id
+        leaf_handlers = self._LEAF_HANDLERS
+        leaf = leaf_handlers.get(type(node))
+        if leaf is not None:
+            # Имя или литерал на верхнем уровне - стек не нужен
+            return leaf(self, node)
+        
+        expr_handlers = self._EXPR_HANDLERS
         
-        if isinstance(node, Literal):
-            # Обработка числовых литералов
-            if isinstance(node.value, str):
-                # Экранирование кавычек
-                escaped = node.value.replace('"', '\\"')
-                return f'"{escaped}"'
-            elif isinstance(node.value, bool):
-                return "True" if node.value else "False"
-            elif node.value is None:
-                return "None"
-            return str(node.value)
+        # Элементы стека: (узел, сборщик, число детей); сборщик None - первое посещение
+        stack = [(node, None, 0)]
+        pop = stack.pop
+        push = stack.append
+        results: List[str] = []
+        emit = results.append
         
-        if isinstance(node, BinOp):
-            left = self._generate_expression(node.left)
-            right = self._generate_expression(node.right)
+        while stack:
+            cur, build, count = pop()
             
-            # Преобразование / (обычное деление) -> / (в Python 3 всегда float)
-            # В Python 2 / для целых чисел = floor division
-            # В Python 3 нужен // для floor division
-            op = node.op
-            if op == '/':
-                # ВНИМАНИЕ: полная трансляция требует анализа типов
-                # Здесь консервативно оставляем / и оставляем от разработчика
-                # проверку на целые числа
-                op = '/'
+            if build is not None:
+                # Второе посещение: результаты детей лежат на вершине results
+                if count:
+                    parts = results[-count:]
+                    del results[-count:]
+                else:
+                    parts = []
+                emit(build(self, cur, parts))
+                continue
             
-            return f"({left} {op} {right})"
-        
-        if isinstance(node, UnaryOp):
-            operand = self._generate_expression(node.operand)
-            return f"({node.op}{operand})"
-        
-        if isinstance(node, Call):
-            func = self._generate_expression(node.func)
+            if cur is None:
+                emit("")
+                continue
             
-            # Преобразование xrange(...) -> range(...)
-            if isinstance(node.func, Name):
-                if node.func.id == 'xrange':
-                    func = 'range'
-                elif node.func.id == 'raw_input':
-                    func = 'input'
-                elif node.func.id == 'unicode':
-                    func = 'str'
-                elif node.func.id == 'reduce':
-                    func = 'functools.reduce'  # require import functools
+            cur_type = type(cur)
+            leaf = leaf_handlers.get(cur_type)
+            if leaf is not None:
+                emit(leaf(self, cur))
+                continue
             
-            args = ", ".join([self._generate_expression(arg) for arg in node.args])
-            return f"{func}({args})"
+            handlers = expr_handlers.get(cur_type)
+            if handlers is None:
+                leaf = self._find_handler(leaf_handlers, cur)
+                if leaf is not None:
+                    emit(leaf(self, cur))
+                    continue
+                handlers = self._find_handler(expr_handlers, cur)
+                if handlers is None:
+                    emit("<unknown>")
+                    continue
+            
+            get_children, build = handlers
+            children = get_children(self, cur)
+            push((cur, build, len(children)))
+            for child in reversed(children):
+                push((child, None, 0))
         
-        return "<unknown>"
+        return results[-1]
+    
+    def _generate_name(self, node: Name) -> str:
+        """Генерация идентификатора"""
+        nid = node.id
+        return self._PY2_RENAMES.get(nid, nid)
+    
+    def _generate_literal(self, node: Literal) -> str:
+        """Генерация литерала"""
+        # Обработка числовых литералов
+        if isinstance(node.value, str):
+            # Экранирование за один проход по таблице
+            escaped = node.value.translate(self._STRING_ESCAPES)
+            return f'"{escaped}"'
+        elif isinstance(node.value, bool):
+            return "True" if node.value else "False"
+        elif node.value is None:
+            return "None"
+        return str(node.value)
+    
+    def _binop_children(self, node: BinOp) -> tuple:
+        """Дочерние выражения бинарной операции"""
+        return (node.left, node.right)
+    
+    def _generate_binop(self, node: BinOp, parts: List[str]) -> str:
+        """Сборка бинарной операции из сгенерированных операндов"""
+        left, right = parts
+        
+        # / оставляем как есть: в Python 2 для целых это floor division,
+        # но полная трансляция в // требует анализа типов
+        op = node.op
+        op = self._PY2_OPERATORS.get(op, op)
+        return f"({left} {op} {right})"
+    
+    def _unaryop_children(self, node: UnaryOp) -> tuple:
+        """Дочернее выражение унарной операции"""
+        return (node.operand,)
+    
+    def _generate_unaryop(self, node: UnaryOp, parts: List[str]) -> str:
+        """Сборка унарной операции из сгенерированного операнда"""
+        operand, = parts
+        return f"({node.op}{operand})"
+    
+    def _call_children(self, node: Call) -> list:
+        """Дочерние выражения вызова (имя функции переименовывается отдельно)"""
+        if type(node.func) is Name:
+            return node.args
+        return [node.func, *node.args]
+    
+    def _generate_call(self, node: Call, parts: List[str]) -> str:
+        """Сборка вызова функции из сгенерированных частей"""
+        func_node = node.func
+        if type(func_node) is Name:
+            # Преобразование xrange(...) -> range(...), reduce -> functools.reduce и т.д.
+            fid = func_node.id
+            func = self._PY2_CALL_RENAMES.get(fid, fid)
+            if fid == 'reduce':
+                self._needs_functools = True
+            args = ", ".join(parts)
+        else:
+            func = parts[0]
+            args = ", ".join(parts[1:])
+        return f"{func}({args})"
+    
+    # Таблицы диспетчеризации: тип узла -> функция-обработчик (вызывается
+    # с self). Строятся один раз при определении класса
+    _STMT_HANDLERS = {
+        FunctionDef: _generate_function_def,
+        ClassDef: _generate_class_def,
+        If: _generate_if,
+        While: _generate_while,
+        For: _generate_for,
+        Print: _generate_print,
+        Return: _generate_return,
+        Import: _generate_import,
+        ImportFrom: _generate_import_from,
+        Assign: _generate_assign,
+        Pass: _generate_keyword,
+        Break: _generate_keyword,
+        Continue: _generate_keyword,
+        Program: _generate_block,
+    }
+    # Листья выражений: тип -> обработчик(self, node)
+    _LEAF_HANDLERS = {
+        Name: _generate_name,
+        Literal: _generate_literal,
+    }
+    # Составные выражения: тип -> (дети(self, node), сборка(self, node, parts))
+    _EXPR_HANDLERS = {
+        BinOp: (_binop_children, _generate_binop),
+        UnaryOp: (_unaryop_children, _generate_unaryop),
+        Call: (_call_children, _generate_call),
+    }
+    # Узлы, которые допустимы как инструкция-выражение
+    _EXPR_STMT_TYPES = (*_LEAF_HANDLERS, *_EXPR_HANDLERS)
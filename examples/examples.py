@@ -156,3 +156,6 @@ for i in range(5)
     print i
 '''
 }
+
+# Названия примеров в порядке объявления (для выпадающего списка)
+EXAMPLE_NAMES = tuple(EXAMPLES)
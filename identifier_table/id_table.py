@@ -5,11 +5,16 @@
 ИСПРАВЛЕННА ВЕРСИЯ: улучшена работа с вложенными областями
 """
 
+import sys
 from dataclasses import dataclass
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 
 
-@dataclass
+# __slots__ у dataclass доступны начиная с Python 3.10
+_ENTRY_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_ENTRY_OPTIONS)
 class IdentifierEntry:
     """Запись в таблице идентификаторов"""
     name: str
@@ -34,11 +39,27 @@ class IdentifierTable:
     
     def __init__(self, initial_capacity: int = 128):
         self._capacity = self._next_power_of_two(max(2, initial_capacity))
+        self._mask = self._capacity - 1  # ёмкость - степень 2: % заменяется на &
+        self._name_hashes: Dict[str, int] = {}  # имя -> полиномиальный хеш
         self._buckets: List[Optional[List[IdentifierEntry]]] = [None] * self._capacity
         self._count = 0
         self._current_scope = "0"
         self._scope_stack = ["0"]
+        # Приоритет областей стека при поиске: область -> позиция в стеке
+        self._scope_priority: Dict[str, int] = {"0": 0}
+        # Имена областей стека: область -> {имя: запись}. Вставка идёт только
+        # в текущую область, поэтому закрытые области здесь не хранятся
+        self._scope_names: Dict[str, Dict[str, IdentifierEntry]] = {"0": {}}
         self._scope_depth_counter = {}  # счётчик блоков на каждом уровне глубины
+        # Ключи сортировки областей: область -> (глубина, буквенный суффикс)
+        self._scope_keys: Dict[str, Tuple[int, str]] = {"0": (0, "")}
+        
+        # Записи в порядке вставки и используемые области; отсортированные
+        # списки строятся при первом запросе и сбрасываются при вставке
+        self._entries: List[IdentifierEntry] = []
+        self._used_scopes: set = set()
+        self._sorted_entries: Optional[List[IdentifierEntry]] = None
+        self._sorted_scopes: Optional[List[str]] = None
         
         # Статистика
         self._total_probes = 0
@@ -48,25 +69,30 @@ class IdentifierTable:
     
     def _next_power_of_two(self, n: int) -> int:
         """Следующая степень 2"""
-        p = 1
-        while p < n:
-            p <<= 1
-        return p
+        return 1 if n <= 1 else 1 << (n - 1).bit_length()
     
     def _hash(self, key: str) -> int:
-        """Улучшенная хеш-функция (полиномиальное хеширование)"""
-        if not key:
-            return 0
-        h = 0
-        for i, ch in enumerate(key):
-            # Полиномиальное хеширование с базой 31
-            h = (h * 31 + ord(ch)) & 0x7FFFFFFF
-        return h % self._capacity
+        """
+        Улучшенная хеш-функция (полиномиальное хеширование).
+        Хеш имени не зависит от размера таблицы, поэтому считается один раз
+        на имя и переиспользуется при повторных вставках, поиске и рехешировании.
+        """
+        h = self._name_hashes.get(key)
+        if h is None:
+            h = 0
+            for ch in key:
+                # Полиномиальное хеширование с базой 31
+                h = (h * 31 + ord(ch)) & 0x7FFFFFFF
+            self._name_hashes[key] = h
+        return h & self._mask
     
     def _is_valid_identifier(self, name: str) -> bool:
         """Проверка корректности идентификатора"""
         if not name:
             return False
+        # Для ASCII правило совпадает с str.isidentifier (проверка на C)
+        if name.isascii():
+            return name.isidentifier()
         if name[0].isdigit():
             return False
         for ch in name:
@@ -74,18 +100,24 @@ class IdentifierTable:
                 return False
         return True
     
+    def _scope_key(self, scope: str) -> Tuple[int, str]:
+        """
+        Ключ области видимости (глубина, буквенный суффикс).
+        Области, созданные enter_scope, уже лежат в кэше; остальные
+        разбираются один раз: цифры в начале строки - глубина.
+        """
+        key = self._scope_keys.get(scope)
+        if key is None:
+            i = 0
+            while i < len(scope) and scope[i] in "0123456789":
+                i += 1
+            key = (int(scope[:i]) if i else 0, scope[i:])
+            self._scope_keys[scope] = key
+        return key
+    
     def _get_scope_depth(self, scope: str) -> int:
         """Получить глубину области видимости"""
-        if scope == "0":
-            return 0
-        # Извлекаем цифры из начала строки
-        depth_str = ""
-        for ch in scope:
-            if ch.isdigit():
-                depth_str += ch
-            else:
-                break
-        return int(depth_str) if depth_str else 0
+        return self._scope_key(scope)[0]
     
     def enter_scope(self) -> str:
         """Войти в новую область видимости (ИСПРАВЛЕНО)"""
@@ -102,13 +134,18 @@ class IdentifierTable:
         # Формирование имени области видимости
         if block_index == 0:
             # Первый блок на этой глубине просто цифра
-            new_scope = str(new_depth)
+            letter = ""
         else:
-            # Остальные блоки: цифра + буква (a, b, c, ...)
-            letter = chr(ord('a') + block_index - 1)
-            new_scope = f"{new_depth}{letter}"
+            # Остальные блоки: цифра + буква (a, b, ..., z, za, ..., zz, zza, ...),
+            # суффиксы сортируются в порядке создания блоков
+            q, r = divmod(block_index - 1, 26)
+            letter = "z" * q + chr(ord('a') + r)
+        new_scope = f"{new_depth}{letter}"
+        self._scope_keys[new_scope] = (new_depth, letter)
         
         self._scope_stack.append(new_scope)
+        self._scope_priority[new_scope] = len(self._scope_stack) - 1
+        self._scope_names[new_scope] = {}
         self._current_scope = new_scope
         return new_scope
     
@@ -119,6 +156,8 @@ class IdentifierTable:
             return None
         
         old_scope = self._scope_stack.pop()
+        del self._scope_priority[old_scope]
+        del self._scope_names[old_scope]
         self._current_scope = self._scope_stack[-1]
         return old_scope
     
@@ -134,6 +173,7 @@ class IdentifierTable:
         """Увеличить размер таблицы при достижении load factor"""
         old_buckets = self._buckets
         self._capacity *= 2
+        self._mask = self._capacity - 1
         self._buckets = [None] * self._capacity
         self._count = 0
         self._total_probes = 0
@@ -166,6 +206,9 @@ class IdentifierTable:
         if not name:
             return False, "Пустое имя идентификатора"
         
+        # Имена хранятся интернированными: в цепочках сравниваем по is
+        name = sys.intern(name)
+        
         if not self._is_valid_identifier(name):
             if name[0].isdigit():
                 return False, f"Идентификатор '{name}' не может начинаться с цифры"
@@ -176,27 +219,30 @@ class IdentifierTable:
         if (self._count / self._capacity) >= self.LOAD_FACTOR_THRESHOLD:
             self._resize()
         
+        # Проверка на существование в текущей области видимости.
+        # Пробы считаются как при просмотре цепочки: бакет + записи до
+        # найденной включительно (pos - индекс записи в цепочке)
+        scope_names = self._scope_names[self._current_scope]
+        existing_entry = scope_names.get(name)
+        if existing_entry is not None:
+            self._total_probes += existing_entry.pos + 2
+            # Запись уже существует в текущей области - обновляем
+            existing_entry.kind = kind
+            existing_entry.type_ = type_
+            existing_entry.value = value
+            if line > 0:
+                existing_entry.line = line
+            if column > 0:
+                existing_entry.column = column
+            return True, None
+        
         bi = self._hash(name)
-        self._total_probes += 1
         
         if self._buckets[bi] is None:
             self._buckets[bi] = []
         
         bucket = self._buckets[bi]
-        
-        # Проверка на существование в текущей области видимости
-        for i, existing_entry in enumerate(bucket):
-            self._total_probes += 1
-            if existing_entry.name == name and existing_entry.scope == self._current_scope:
-                # Запись уже существует в текущей области - обновляем
-                existing_entry.kind = kind
-                existing_entry.type_ = type_
-                existing_entry.value = value
-                if line > 0:
-                    existing_entry.line = line
-                if column > 0:
-                    existing_entry.column = column
-                return True, None
+        self._total_probes += len(bucket) + 1
         
         # Добавление новой записи в текущую область видимости
         entry = IdentifierEntry(
@@ -212,9 +258,16 @@ class IdentifierTable:
         )
         
         bucket.append(entry)
+        scope_names[name] = entry
         self._count += 1
         self._insertions += 1
         
+        self._entries.append(entry)
+        self._sorted_entries = None
+        if entry.scope not in self._used_scopes:
+            self._used_scopes.add(entry.scope)
+            self._sorted_scopes = None
+        
         # Подсчёт коллизий
         if len(bucket) > 1:
             self._collisions += 1
@@ -230,6 +283,7 @@ class IdentifierTable:
         if not name:
             return None
         
+        name = sys.intern(name)
         bi = self._hash(name)
         self._total_probes += 1
         self._searches += 1
@@ -238,16 +292,20 @@ class IdentifierTable:
         if not bucket:
             return None
         
-        # Поиск по стеку областей видимости (от текущей к глобальной)
-        # Ищем в обратном порядке (от более специфичной к менее специфичной)
-        for scope_index in range(len(self._scope_stack) - 1, -1, -1):
-            target_scope = self._scope_stack[scope_index]
-            for entry in bucket:
-                self._total_probes += 1
-                if entry.name == name and entry.scope == target_scope:
-                    return entry
+        # Один проход по цепочке: среди записей с этим именем выбираем
+        # запись из самой вложенной области стека (области вне стека
+        # имеют приоритет -1 и не подходят)
+        priority = self._scope_priority
+        best = None
+        best_priority = -1
+        for entry in bucket:
+            if entry.name is name:
+                p = priority.get(entry.scope, -1)
+                if p > best_priority:
+                    best, best_priority = entry, p
+        self._total_probes += len(bucket)
         
-        return None
+        return best
     
     def search_local(self, name: str) -> Optional[IdentifierEntry]:
         """
@@ -256,63 +314,26 @@ class IdentifierTable:
         if not name:
             return None
         
-        bi = self._hash(name)
-        bucket = self._buckets[bi]
-        if not bucket:
-            return None
-        
-        for entry in bucket:
-            if entry.name == name and entry.scope == self._current_scope:
-                return entry
-        
-        return None
+        return self._scope_names[self._current_scope].get(name)
     
     def get_all_entries(self) -> List[IdentifierEntry]:
         """Получить все записи в отсортированном порядке"""
-        result = []
-        for bucket in self._buckets:
-            if bucket:
-                result.extend(bucket)
-        
-        # Сортировка: сначала по области видимости, потом по имени
-        def sort_key(entry: IdentifierEntry) -> tuple:
-            scope = entry.scope
-            if scope == "0":
-                depth, letter = 0, ""
-            else:
-                depth = self._get_scope_depth(scope)
-                letter = scope[len(str(depth)):] if len(scope) > len(str(depth)) else ""
-            return (depth, letter, entry.name)
-        
-        return sorted(result, key=sort_key)
+        if self._sorted_entries is None:
+            # Сортировка: сначала по области видимости, потом по имени
+            scope_key = self._scope_key
+            self._sorted_entries = sorted(self._entries, key=lambda e: (*scope_key(e.scope), e.name))
+        return self._sorted_entries.copy()
     
     def get_entries_by_scope(self, scope: str) -> List[IdentifierEntry]:
         """Получить все записи в определённой области видимости"""
-        result = []
-        for bucket in self._buckets:
-            if bucket:
-                for entry in bucket:
-                    if entry.scope == scope:
-                        result.append(entry)
-        return sorted(result, key=lambda e: e.name)
+        return sorted([e for e in self._entries if e.scope == scope], key=lambda e: e.name)
     
     def get_all_scopes(self) -> List[str]:
         """Получить все используемые области видимости"""
-        scopes = set()
-        for bucket in self._buckets:
-            if bucket:
-                for entry in bucket:
-                    scopes.add(entry.scope)
-        
-        # Сортировка по глубине и букве
-        def scope_sort_key(scope: str) -> tuple:
-            if scope == "0":
-                return (0, "")
-            depth = self._get_scope_depth(scope)
-            letter = scope[len(str(depth)):]
-            return (depth, letter)
-        
-        return sorted(scopes, key=scope_sort_key)
+        if self._sorted_scopes is None:
+            # Сортировка по глубине и букве
+            self._sorted_scopes = sorted(self._used_scopes, key=self._scope_key)
+        return self._sorted_scopes.copy()
     
     def get_scope_tree(self) -> str:
         """Получить визуальное представление иерархии областей видимости"""
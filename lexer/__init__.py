@@ -2,6 +2,6 @@
 # -*- coding: utf-8 -*-
 
 from .lexer import Lexer
-from .tokens import Token, TokenType, KEYWORD_MAP
+from .tokens import Token, TokenType, KEYWORD_MAP, TOKEN_TYPE_NAMES
 
-__all__ = ['Lexer', 'Token', 'TokenType', 'KEYWORD_MAP']
+__all__ = ['Lexer', 'Token', 'TokenType', 'KEYWORD_MAP', 'TOKEN_TYPE_NAMES']
@@ -5,11 +5,74 @@
 ИСПРАВЛЕННА ВЕРСИЯ: корректная обработка таблицы идентификаторов
 """
 
+import re
 from typing import List, Optional
 from .tokens import Token, TokenType, KEYWORD_MAP, PYTHON2_KEYWORDS
 from identifier_table import IdentifierTable
 
 
+# Фрагменты токенов, читаемые одним срезом
+_IDENTIFIER_RE = re.compile(r'\w*')  # \w = str.isalnum() или '_'
+_DIGITS_RE = re.compile(r'\d*')
+_BLANKS_RE = re.compile(r'[ \t]*')
+_BLANKS_AND_NEWLINES_RE = re.compile(r'[ \t\n]*')
+_HEX_DIGITS_RE = re.compile(r'[0-9a-fA-F]*')
+_BIN_DIGITS_RE = re.compile(r'[01]*')
+_OCT_DIGITS_RE = re.compile(r'[0-7]*')
+# Тело строки до кавычки или обратной косой черты
+_STRING_BODY_RE = {
+    '"': re.compile(r'[^"\\]*'),
+    "'": re.compile(r"[^'\\]*"),
+}
+# Escape-последовательности строк
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', "'": "'", '"': '"'}
+
+# Двухсимвольные операторы: текст -> тип токена
+_TWO_CHAR_OPERATORS = {
+    '==': TokenType.EQ,
+    '!=': TokenType.NE,
+    '<=': TokenType.LE,
+    '<>': TokenType.NE,  # Python 2: <> = not equal
+    '>=': TokenType.GE,
+    '+=': TokenType.PLUS_ASSIGN,
+    '-=': TokenType.MINUS_ASSIGN,
+    '->': TokenType.ARROW,
+    '*=': TokenType.MULT_ASSIGN,
+    '**': TokenType.POWER,
+    '/=': TokenType.DIV_ASSIGN,
+    '//': TokenType.FLOOR_DIVIDE,
+    '%=': TokenType.MOD_ASSIGN,
+}
+
+# Односимвольные операторы и разделители
+_SINGLE_CHAR_OPERATORS = {
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULTIPLY,
+    '/': TokenType.DIVIDE,
+    '%': TokenType.MODULO,
+    '=': TokenType.ASSIGN,
+    '<': TokenType.LT,
+    '>': TokenType.GT,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '[': TokenType.LBRACKET,
+    ']': TokenType.RBRACKET,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    ',': TokenType.COMMA,
+    ':': TokenType.COLON,
+    ';': TokenType.SEMICOLON,
+    '.': TokenType.DOT,
+}
+
+
+def _decode_escape(escape_char: str) -> str:
+    """Значение escape-последовательности; неизвестные сохраняют обратную косую черту"""
+    decoded = _ESCAPES.get(escape_char)
+    return decoded if decoded is not None else '\\' + escape_char
+
+
 class Lexer:
     """Лексический анализатор с поддержкой отступов (исправленная версия)"""
     
@@ -54,16 +117,34 @@ class Lexer:
             return ch
         return None
     
+    def _skip_text(self, text: str) -> None:
+        """Продвинуться на уже прочитанный фрагмент (с учётом переводов строк)"""
+        self.pos += len(text)
+        newlines = text.count('\n')
+        if newlines:
+            self.line += newlines
+            self.column = len(text) - text.rfind('\n')
+        else:
+            self.column += len(text)
+    
+    def _take(self, pattern: re.Pattern) -> str:
+        """Прочитать одним срезом фрагмент, совпавший с pattern с текущей позиции"""
+        value = pattern.match(self.source, self.pos).group()
+        if value:
+            self._skip_text(value)
+        return value
+    
+    def _read_digits(self) -> str:
+        """Чтение последовательности цифр (str.isdigit)"""
+        value = self._take(_DIGITS_RE)
+        # Символы-цифры вне \d (например, '³') дочитываем посимвольно
+        while self.current_char() and self.current_char().isdigit():
+            value += self.advance() + self._take(_DIGITS_RE)
+        return value
+    
     def skip_whitespace(self, skip_newline: bool = False):
         """Пропустить пробелы (но не новые строки, если не указано)"""
-        while self.current_char():
-            ch = self.current_char()
-            if ch == ' ' or ch == '\t':
-                self.advance()
-            elif ch == '\n' and skip_newline:
-                self.advance()
-            else:
-                break
+        self._take(_BLANKS_AND_NEWLINES_RE if skip_newline else _BLANKS_RE)
     
     def handle_indentation(self):
         """Обработка отступов в начале строки (ИСПРАВЛЕННАЯ)"""
@@ -74,13 +155,11 @@ class Lexer:
         start_line = self.line
         start_col = self.column
         
-        # Считаем пробелы и табы
-        while self.current_char() in (' ', '\t'):
-            if self.current_char() == ' ':
-                indent_level += 1
-            else:  # tab = 4 пробела
-                indent_level += 4
-            self.advance()
+        # Считаем пробелы и табы (tab = 4 пробела)
+        blanks = self._take(_BLANKS_RE)
+        if blanks:
+            tabs = blanks.count('\t')
+            indent_level = len(blanks) + 3 * tabs
         
         # Пропустим пустые строки и комментарии (они не влияют на отступ)
         if self.current_char() in ('\n', '#', None):
@@ -117,19 +196,14 @@ class Lexer:
         """Чтение идентификатора или ключевого слова"""
         start_line = self.line
         start_column = self.column
-        value = ''
         
-        # Первый символ: буква или _
-        if self.current_char() and (self.current_char().isalpha() or self.current_char() == '_'):
-            value += self.advance()
-        
-        # Остальные: буквы, цифры, _
-        while self.current_char() and (self.current_char().isalnum() or self.current_char() == '_'):
-            value += self.advance()
+        # Первый символ (буква или _) проверен в scan; остальные: буквы, цифры, _
+        value = self._take(_IDENTIFIER_RE)
         
         # Проверка на ключевое слово
-        if value in KEYWORD_MAP:
-            return Token(KEYWORD_MAP[value], value, start_line, start_column)
+        keyword_type = KEYWORD_MAP.get(value)
+        if keyword_type is not None:
+            return Token(keyword_type, value, start_line, start_column)
         
         # Добавляем идентификатор в таблицу (ИСПРАВЛЕНО)
         success, error = self.identifier_table.insert(
@@ -154,8 +228,7 @@ class Lexer:
         if self.current_char() == '0' and self.peek_char() in ('x', 'X'):
             value += self.advance()  # 0
             value += self.advance()  # x
-            while self.current_char() and self.current_char() in '0123456789abcdefABCDEF':
-                value += self.advance()
+            value += self._take(_HEX_DIGITS_RE)
             try:
                 return Token(TokenType.NUMBER, int(value, 16), start_line, start_column)
             except ValueError:
@@ -166,8 +239,7 @@ class Lexer:
         if self.current_char() == '0' and self.peek_char() in ('b', 'B'):
             value += self.advance()  # 0
             value += self.advance()  # b
-            while self.current_char() and self.current_char() in '01':
-                value += self.advance()
+            value += self._take(_BIN_DIGITS_RE)
             try:
                 return Token(TokenType.NUMBER, int(value, 2), start_line, start_column)
             except ValueError:
@@ -178,8 +250,7 @@ class Lexer:
         if self.current_char() == '0' and self.peek_char() in ('o', 'O'):
             value += self.advance()  # 0
             value += self.advance()  # o
-            while self.current_char() and self.current_char() in '01234567':
-                value += self.advance()
+            value += self._take(_OCT_DIGITS_RE)
             try:
                 return Token(TokenType.NUMBER, int(value, 8), start_line, start_column)
             except ValueError:
@@ -188,15 +259,13 @@ class Lexer:
         
         # Обычное число
         is_float = False
-        while self.current_char() and self.current_char().isdigit():
-            value += self.advance()
+        value += self._read_digits()
         
         # Дробная часть
         if self.current_char() == '.' and self.peek_char() and self.peek_char().isdigit():
             is_float = True
             value += self.advance()  # .
-            while self.current_char() and self.current_char().isdigit():
-                value += self.advance()
+            value += self._read_digits()
         
         # Экспонента
         if self.current_char() in ('e', 'E'):
@@ -204,8 +273,7 @@ class Lexer:
             value += self.advance()
             if self.current_char() in ('+', '-'):
                 value += self.advance()
-            while self.current_char() and self.current_char().isdigit():
-                value += self.advance()
+            value += self._read_digits()
         
         # Python 2: long suffix L or l
         has_long_suffix = False
@@ -235,30 +303,43 @@ class Lexer:
             self.advance()  # вторая
             self.advance()  # третья
             
-            # Читаем до закрывающих тройных кавычек
-            while self.current_char():
-                if (self.current_char() == quote and 
-                    self.peek_char() == quote and 
-                    self.peek_char(2) == quote):
-                    self.advance()
-                    self.advance()
-                    self.advance()
+            # Читаем до закрывающих тройных кавычек (или до конца текста);
+            # escape-последовательности декодируются как в обычных строках
+            source = self.source
+            closing = quote * 3
+            parts = []
+            while True:
+                end = source.find(closing, self.pos)
+                stop = end if end >= 0 else len(source)
+                slash = source.find('\\', self.pos, stop)
+                chunk = source[self.pos:stop if slash < 0 else slash]
+                self._skip_text(chunk)
+                parts.append(chunk)
+                if slash < 0:
                     break
-                value += self.advance()
+                self.advance()  # обратная косая черта
+                escape_char = self.advance()
+                if escape_char:
+                    parts.append(_decode_escape(escape_char))
+            value = ''.join(parts)
+            if end >= 0:
+                self.advance()
+                self.advance()
+                self.advance()
         else:
             self.advance()  # открывающая кавычка
             
-            # Читаем до закрывающей кавычки
-            while self.current_char() and self.current_char() != quote:
-                if self.current_char() == '\\':
-                    self.advance()
-                    escape_char = self.advance()
-                    if escape_char:
-                        # Обработка escape-последовательностей
-                        escape_map = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', quote: quote}
-                        value += escape_map.get(escape_char, escape_char)
-                else:
-                    value += self.advance()
+            # Читаем до закрывающей кавычки: фрагменты без экранирования - срезом
+            body_re = _STRING_BODY_RE[quote]
+            parts = [self._take(body_re)]
+            while self.current_char() == '\\':
+                self.advance()
+                escape_char = self.advance()
+                if escape_char:
+                    # Обработка escape-последовательностей
+                    parts.append(_decode_escape(escape_char))
+                parts.append(self._take(body_re))
+            value = ''.join(parts)
             
             if self.current_char() == quote:
                 self.advance()  # закрывающая кавычка
@@ -271,139 +352,85 @@ class Lexer:
     
     def scan(self) -> List[Token]:
         """Главный цикл сканирования (исправленная)"""
-        while self.pos < len(self.source):
+        # Часто используемые атрибуты - в локальные переменные
+        source = self.source
+        length = len(source)
+        tokens = self.tokens
+        append = tokens.append
+        no_newline_after = (TokenType.NEWLINE, TokenType.INDENT, TokenType.DEDENT)
+        
+        while self.pos < length:
             # Обработка отступов в начале строки
             if self.at_line_start:
                 self.handle_indentation()
+                if self.pos >= length:
+                    break
             
-            ch = self.current_char()
-            if not ch:
-                break
-            
+            ch = source[self.pos]
             start_line = self.line
             start_col = self.column
             
             # Пробелы (только между токенами, не в начале строки)
-            if ch in (' ', '\t'):
-                self.skip_whitespace()
+            if ch == ' ' or ch == '\t':
+                self._take(_BLANKS_RE)
                 continue
             
             # Новая строка
             if ch == '\n':
                 # Добавляем NEWLINE только если последний токен не NEWLINE, INDENT, DEDENT
-                if self.tokens and self.tokens[-1].type not in (TokenType.NEWLINE, TokenType.INDENT, TokenType.DEDENT):
-                    self.tokens.append(Token(TokenType.NEWLINE, '\n', start_line, start_col))
+                if tokens and tokens[-1].type not in no_newline_after:
+                    append(Token(TokenType.NEWLINE, '\n', start_line, start_col))
                 self.advance()
                 self.at_line_start = True
                 continue
             
-            # Комментарии (пропускаются полностью)
+            # Комментарии (пропускаются полностью, до конца строки)
             if ch == '#':
-                while self.current_char() and self.current_char() != '\n':
-                    self.advance()
+                end = source.find('\n', self.pos)
+                if end < 0:
+                    end = length
+                self.column += end - self.pos
+                self.pos = end
                 continue
             
             # Идентификаторы и ключевые слова
             if ch.isalpha() or ch == '_':
-                self.tokens.append(self.read_identifier_or_keyword())
+                append(self.read_identifier_or_keyword())
                 continue
             
             # Числа
             if ch.isdigit():
-                self.tokens.append(self.read_number())
+                append(self.read_number())
                 continue
             
             # Строки
-            if ch in ('"', "'"):
-                self.tokens.append(self.read_string(ch))
+            if ch == '"' or ch == "'":
+                append(self.read_string(ch))
                 continue
             
-            # Операторы и разделители
-            self.advance()
+            # Операторы и разделители (ch - не перевод строки)
+            self.pos += 1
+            self.column += 1
             
             # Двухсимвольные операторы
-            if ch == '=' and self.current_char() == '=':
-                self.advance()
-                self.tokens.append(Token(TokenType.EQ, '==', start_line, start_col))
-            elif ch == '!' and self.current_char() == '=':
-                self.advance()
-                self.tokens.append(Token(TokenType.NE, '!=', start_line, start_col))
-            elif ch == '<' and self.current_char() == '=':
-                self.advance()
-                self.tokens.append(Token(TokenType.LE, '<=', start_line, start_col))
-            elif ch == '<' and self.current_char() == '>':
-                # Python 2: <> = not equal
-                self.advance()
-                self.tokens.append(Token(TokenType.NE, '<>', start_line, start_col))
-            elif ch == '>' and self.current_char() == '=':
-                self.advance()
-                self.tokens.append(Token(TokenType.GE, '>=', start_line, start_col))
-            elif ch == '+' and self.current_char() == '=':
-                self.advance()
-                self.tokens.append(Token(TokenType.PLUS_ASSIGN, '+=', start_line, start_col))
-            elif ch == '-' and self.current_char() == '=':
-                self.advance()
-                self.tokens.append(Token(TokenType.MINUS_ASSIGN, '-=', start_line, start_col))
-            elif ch == '-' and self.current_char() == '>':
-                self.advance()
-                self.tokens.append(Token(TokenType.ARROW, '->', start_line, start_col))
-            elif ch == '*' and self.current_char() == '=':
-                self.advance()
-                self.tokens.append(Token(TokenType.MULT_ASSIGN, '*=', start_line, start_col))
-            elif ch == '*' and self.current_char() == '*':
-                self.advance()
-                self.tokens.append(Token(TokenType.POWER, '**', start_line, start_col))
-            elif ch == '/' and self.current_char() == '=':
-                self.advance()
-                self.tokens.append(Token(TokenType.DIV_ASSIGN, '/=', start_line, start_col))
-            elif ch == '/' and self.current_char() == '/':
-                self.advance()
-                self.tokens.append(Token(TokenType.FLOOR_DIVIDE, '//', start_line, start_col))
-            elif ch == '%' and self.current_char() == '=':
-                self.advance()
-                self.tokens.append(Token(TokenType.MOD_ASSIGN, '%=', start_line, start_col))
+            if self.pos < length:
+                op = ch + source[self.pos]
+                token_type = _TWO_CHAR_OPERATORS.get(op)
+                if token_type is not None:
+                    self.pos += 1
+                    self.column += 1
+                    append(Token(token_type, op, start_line, start_col))
+                    continue
+            
             # Односимвольные
-            elif ch == '+':
-                self.tokens.append(Token(TokenType.PLUS, '+', start_line, start_col))
-            elif ch == '-':
-                self.tokens.append(Token(TokenType.MINUS, '-', start_line, start_col))
-            elif ch == '*':
-                self.tokens.append(Token(TokenType.MULTIPLY, '*', start_line, start_col))
-            elif ch == '/':
-                self.tokens.append(Token(TokenType.DIVIDE, '/', start_line, start_col))
-            elif ch == '%':
-                self.tokens.append(Token(TokenType.MODULO, '%', start_line, start_col))
-            elif ch == '=':
-                self.tokens.append(Token(TokenType.ASSIGN, '=', start_line, start_col))
-            elif ch == '<':
-                self.tokens.append(Token(TokenType.LT, '<', start_line, start_col))
-            elif ch == '>':
-                self.tokens.append(Token(TokenType.GT, '>', start_line, start_col))
-            elif ch == '(':
-                self.tokens.append(Token(TokenType.LPAREN, '(', start_line, start_col))
-            elif ch == ')':
-                self.tokens.append(Token(TokenType.RPAREN, ')', start_line, start_col))
-            elif ch == '[':
-                self.tokens.append(Token(TokenType.LBRACKET, '[', start_line, start_col))
-            elif ch == ']':
-                self.tokens.append(Token(TokenType.RBRACKET, ']', start_line, start_col))
-            elif ch == '{':
-                self.tokens.append(Token(TokenType.LBRACE, '{', start_line, start_col))
-            elif ch == '}':
-                self.tokens.append(Token(TokenType.RBRACE, '}', start_line, start_col))
-            elif ch == ',':
-                self.tokens.append(Token(TokenType.COMMA, ',', start_line, start_col))
-            elif ch == ':':
-                self.tokens.append(Token(TokenType.COLON, ':', start_line, start_col))
-            elif ch == ';':
-                self.tokens.append(Token(TokenType.SEMICOLON, ';', start_line, start_col))
-            elif ch == '.':
-                self.tokens.append(Token(TokenType.DOT, '.', start_line, start_col))
+            token_type = _SINGLE_CHAR_OPERATORS.get(ch)
+            if token_type is not None:
+                append(Token(token_type, ch, start_line, start_col))
             else:
                 self.errors.append(
                     f"Строка {start_line}:{start_col}: Неизвестный символ '{ch}'"
                 )
-                self.tokens.append(Token(TokenType.UNKNOWN, ch, start_line, start_col))
+                append(Token(TokenType.UNKNOWN, ch, start_line, start_col))
         
         # Генерируем DEDENT для всех оставшихся уровней отступа
         while len(self.indent_stack) > 1:
@@ -4,12 +4,13 @@
 Определение типов токенов для Python лексера
 """
 
-from enum import Enum, auto
+import sys
+from enum import IntEnum, auto
 from dataclasses import dataclass
 from typing import Any, Optional
 
 
-class TokenType(Enum):
+class TokenType(IntEnum):
     """Типы токенов Python"""
     # Ключевые слова Python 2/3
     AND = auto()
@@ -98,7 +99,14 @@ class TokenType(Enum):
     UNKNOWN = auto()
 
 
-@dataclass
+# Имена типов токенов: TokenType.name - свойство enum, а не простой атрибут
+TOKEN_TYPE_NAMES = {token_type: token_type.name for token_type in TokenType}
+
+# __slots__ у dataclass доступны начиная с Python 3.10
+_TOKEN_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_TOKEN_OPTIONS)
 class Token:
     """Токен с метаданными"""
     type: TokenType
@@ -107,24 +115,24 @@ class Token:
     column: int
     
     def __repr__(self) -> str:
-        return f"Token({self.type.name}, {repr(self.value)}, {self.line}:{self.column})"
+        return f"Token({TOKEN_TYPE_NAMES[self.type]}, {self.value!r}, {self.line}:{self.column})"
 
 
 # Ключевые слова Python 2 и Python 3
-PYTHON2_KEYWORDS = {
+PYTHON2_KEYWORDS = frozenset({
     'and', 'as', 'assert', 'break', 'class', 'continue', 'def', 'del',
     'elif', 'else', 'except', 'exec', 'finally', 'for', 'from', 'global',
     'if', 'import', 'in', 'is', 'lambda', 'not', 'or', 'pass', 'print',
     'raise', 'return', 'try', 'while', 'with', 'yield', 'None', 'True', 'False'
-}
+})
 
-PYTHON3_KEYWORDS = {
+PYTHON3_KEYWORDS = frozenset({
     'and', 'as', 'assert', 'break', 'class', 'continue', 'def', 'del',
     'elif', 'else', 'except', 'finally', 'for', 'from', 'global',
     'if', 'import', 'in', 'is', 'lambda', 'not', 'or', 'pass',
     'raise', 'return', 'try', 'while', 'with', 'yield', 'None', 'True', 'False',
     'nonlocal', 'async', 'await'
-}
+})
 
 # Маппинг ключевых слов к типам токенов
 KEYWORD_MAP = {
@@ -5,7 +5,9 @@
 """
 
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
 from typing import Optional
 
@@ -17,6 +19,7 @@ class TranslatorLogger:
         self.log_dir = log_dir
         self.current_log_file: Optional[str] = None
         self.logger: Optional[logging.Logger] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
         
         # Создаём директорию для логов
         if not os.path.exists(log_dir):
@@ -45,46 +48,53 @@ class TranslatorLogger:
         )
         file_handler.setFormatter(formatter)
         
-        self.logger.addHandler(file_handler)
+        # Запись в файл идёт в отдельном потоке, вызывающий поток
+        # только кладёт запись в очередь
+        log_queue = queue.Queue()
+        self.listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        self.listener.start()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
         
         # Пишем заголовок
         self.logger.info("=" * 80)
         self.logger.info("НОВАЯ СЕССИЯ ТРАНСЛЯЦИИ")
-        self.logger.info(f"Файл лога: {self.current_log_file}")
-        self.logger.info(f"Время: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self.logger.info("Файл лога: %s", self.current_log_file)
+        self.logger.info("Время: %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         self.logger.info("=" * 80)
         
         return self.current_log_file
     
-    def debug(self, message: str):
-        """Debug сообщение"""
+    def debug(self, message: str, *args):
+        """Debug сообщение (аргументы подставляются в %-стиле только при записи)"""
         if self.logger:
-            self.logger.debug(message)
+            self.logger.debug(message, *args)
     
-    def info(self, message: str):
+    def info(self, message: str, *args):
         """Info сообщение"""
         if self.logger:
-            self.logger.info(message)
+            self.logger.info(message, *args)
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """Warning сообщение"""
         if self.logger:
-            self.logger.warning(message)
+            self.logger.warning(message, *args)
     
-    def error(self, message: str):
+    def error(self, message: str, *args):
         """Error сообщение"""
         if self.logger:
-            self.logger.error(message)
+            self.logger.error(message, *args)
     
-    def critical(self, message: str):
+    def critical(self, message: str, *args):
         """Critical сообщение"""
         if self.logger:
-            self.logger.critical(message)
+            self.logger.critical(message, *args)
     
-    def exception(self, message: str):
+    def exception(self, message: str, *args):
         """Логирование исключения"""
         if self.logger:
-            self.logger.exception(message)
+            self.logger.exception(message, *args)
     
     def separator(self, char: str = "-", length: int = 60):
         """Разделитель"""
@@ -95,7 +105,7 @@ class TranslatorLogger:
         """Заголовок секции"""
         if self.logger:
             self.logger.info("")
-            self.logger.info(f"{'=' * 20} {title} {'=' * 20}")
+            self.logger.info("%s %s %s", '=' * 20, title, '=' * 20)
     
     def close(self):
         """Закрыть текущий лог"""
@@ -105,8 +115,14 @@ class TranslatorLogger:
             self.logger.info("СЕССИЯ ЗАВЕРШЕНА")
             self.logger.info("=" * 80)
             
-            # Закрываем handlers
+            # Дожидаемся записи очереди и закрываем handlers
             for handler in self.logger.handlers:
                 handler.close()
+            self.logger.handlers = []
+            if self.listener:
+                self.listener.stop()
+                for handler in self.listener.handlers:
+                    handler.close()
+                self.listener = None
             
             self.logger = None
@@ -7,23 +7,46 @@
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
+from dataclasses import dataclass, field
 from typing import Optional, List, Tuple
+import copy
+import queue
+import threading
 import traceback
 import sys
 
-from lexer import Lexer, Token, TokenType
+from lexer import Lexer, Token, TokenType, KEYWORD_MAP, TOKEN_TYPE_NAMES
 from parser import Parser
-from parser.ast_nodes import ASTNode, Program
+from parser.ast_nodes import (
+    ASTNode, Program, FunctionDef, ClassDef, If, While, For, Print,
+    Assign, BinOp, UnaryOp, Call, Return,
+)
 from identifier_table import IdentifierTable
 from optimizer import Optimizer
 from code_generator import CodeGenerator
-from examples.examples import EXAMPLES
+from examples.examples import EXAMPLES, EXAMPLE_NAMES
 from logger import TranslatorLogger
 
 
 class ASTVisualizer:
     """Визуализатор синтаксического дерева на Canvas"""
     
+    # Поля с дочерними узлами для каждого класса AST (в порядке обхода)
+    _CHILD_FIELDS = {
+        Program: ('body',),
+        FunctionDef: ('body',),
+        ClassDef: ('body',),
+        If: ('condition', 'then_body', 'elif_blocks', 'else_body'),
+        While: ('body', 'condition'),
+        For: ('body', 'target', 'iter'),
+        Print: ('args',),
+        Assign: ('target', 'value'),
+        BinOp: ('left', 'right'),
+        UnaryOp: ('operand',),
+        Call: ('args', 'func'),
+        Return: ('value',),
+    }
+    
     def __init__(self, canvas: tk.Canvas):
         self.canvas = canvas
         self.node_width = 120
@@ -32,6 +55,7 @@ class ASTVisualizer:
         self.horizontal_spacing = 20
         self.node_positions = {}  # {node_id: (x, y)}
         self.next_x = 50  # Следующая X координата
+        self.node_descriptors = {}  # {класс узла: (имя, цвет, поля подписи)}
         
     def clear(self):
         """Очистить canvas"""
@@ -97,50 +121,18 @@ class ASTVisualizer:
     def _get_children(self, node: ASTNode) -> List[ASTNode]:
         """Получить список дочерних узлов"""
         children = []
-        
-        if hasattr(node, 'body') and isinstance(node.body, list):
-            children.extend([c for c in node.body if c])
-        
-        if hasattr(node, 'condition') and node.condition:
-            children.append(node.condition)
-        
-        if hasattr(node, 'then_body') and node.then_body:
-            children.extend([c for c in node.then_body if c])
-        
-        if hasattr(node, 'elif_blocks') and node.elif_blocks:
-            for cond, body in node.elif_blocks:
-                if cond:
-                    children.append(cond)
-                if body:
-                    children.extend([c for c in body if c])
-        
-        if hasattr(node, 'else_body') and node.else_body:
-            children.extend([c for c in node.else_body if c])
-        
-        if hasattr(node, 'left') and node.left:
-            children.append(node.left)
-        
-        if hasattr(node, 'right') and node.right:
-            children.append(node.right)
-        
-        if hasattr(node, 'operand') and node.operand:
-            children.append(node.operand)
-        
-        if hasattr(node, 'target') and node.target:
-            children.append(node.target)
-        
-        if hasattr(node, 'value') and isinstance(node.value, ASTNode):
-            children.append(node.value)
-        
-        if hasattr(node, 'iter') and isinstance(node.iter, ASTNode):
-            children.append(node.iter)
-        
-        if hasattr(node, 'args') and node.args:
-            children.extend([arg for arg in node.args if isinstance(arg, ASTNode)])
-        
-        if hasattr(node, 'func') and isinstance(node.func, ASTNode):
-            children.append(node.func)
-        
+        for attr in self._CHILD_FIELDS.get(type(node), ()):
+            value = getattr(node, attr)
+            if attr == 'elif_blocks':
+                for cond, body in value:
+                    if cond:
+                        children.append(cond)
+                    if body:
+                        children.extend([c for c in body if c])
+            elif isinstance(value, list):
+                children.extend([c for c in value if isinstance(c, ASTNode)])
+            elif isinstance(value, ASTNode):
+                children.append(value)
         return children
     
     def _draw_connections(self, node: ASTNode):
@@ -180,22 +172,7 @@ class ASTVisualizer:
         x, y = self.node_positions[node_id]
         
         # Определяем текст и цвет узла
-        node_type = type(node).__name__
-        node_text = node_type
-        node_color = self._get_node_color(node_type)
-        
-        # Добавляем дополнительную информацию
-        if hasattr(node, 'name') and node.name:
-            node_text = f"{node_type}\n{node.name}"
-        elif hasattr(node, 'id') and node.id:
-            node_text = f"{node_type}\n{node.id}"
-        elif hasattr(node, 'value') and node.value is not None and not isinstance(node.value, ASTNode):
-            val_str = str(node.value)[:15]
-            if len(str(node.value)) > 15:
-                val_str += '...'
-            node_text = f"{node_type}\n{val_str}"
-        elif hasattr(node, 'op') and node.op:
-            node_text = f"{node_type}\n{node.op}"
+        node_text, node_color = self._node_label(node)
         
         # Рисуем прямоугольник
         rect = self.canvas.create_rectangle(
@@ -216,6 +193,31 @@ class ASTVisualizer:
             if child:
                 self._draw_nodes(child)
     
+    def _node_label(self, node: ASTNode) -> Tuple[str, str]:
+        """Текст и цвет узла (описание класса вычисляется один раз)"""
+        descr = self.node_descriptors.get(type(node))
+        if descr is None:
+            node_type = type(node).__name__
+            label_fields = tuple(attr for attr in ('name', 'id', 'value', 'op')
+                                 if hasattr(node, attr))
+            descr = (node_type, self._get_node_color(node_type), label_fields)
+            self.node_descriptors[type(node)] = descr
+        node_type, node_color, label_fields = descr
+        
+        # Добавляем дополнительную информацию
+        for attr in label_fields:
+            value = getattr(node, attr)
+            if attr == 'value':
+                if value is None or isinstance(value, ASTNode):
+                    continue
+                val_str = str(value)
+                if len(val_str) > 15:
+                    return f"{node_type}\n{val_str[:15]}...", node_color
+                return f"{node_type}\n{val_str}", node_color
+            if value:
+                return f"{node_type}\n{value}", node_color
+        return node_type, node_color
+    
     def _get_node_color(self, node_type: str) -> str:
         """Получить цвет узла по типу"""
         color_map = {
@@ -237,9 +239,30 @@ class ASTVisualizer:
         return color_map.get(node_type, '#E0E0E0')
 
 
+@dataclass
+class AnalysisResult:
+    """Результаты анализа, собранные рабочим потоком"""
+    tokens: List[Token] = field(default_factory=list)
+    ast: Optional[ASTNode] = None
+    python3_code: Optional[str] = None
+    error: Optional[Exception] = None
+
+
 class TranslatorGUI:
     """Главное окно приложения"""
     
+    # Тег строки таблицы лексем по типу токена (цвет задаётся в _setup_styles)
+    TOKEN_TAGS = {
+        **{keyword_type: 'keyword' for keyword_type in KEYWORD_MAP.values()},
+        TokenType.IDENTIFIER: 'identifier',
+        TokenType.NUMBER: 'number',
+        TokenType.STRING: 'string',
+        TokenType.UNKNOWN: 'error',
+    }
+    
+    # Период опроса очереди рабочего потока, мс
+    UI_POLL_MS = 50
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Транслятор Python2 → Python3")
@@ -254,19 +277,36 @@ class TranslatorGUI:
         self.ast: Optional[ASTNode] = None
         self.ast_visualizer: Optional[ASTVisualizer] = None
         
+        # Рабочий поток анализа и очередь сообщений для интерфейса
+        self.worker: Optional[threading.Thread] = None
+        self.ui_queue: queue.Queue = queue.Queue()
+        self._poll_id: Optional[str] = None  # отложенный вызов опроса очереди
+        
         # Логгер
         self.logger = TranslatorLogger()
         
         # Цвета для scope
-        self.scope_colors = [
+        self.scope_colors = (
             '#E8F5E9', '#FFF9C4', '#FFE0B2', '#FFCCBC', '#FFAB91',
             '#F8BBD0', '#E1BEE7', '#D1C4E9', '#C5CAE9', '#BBDEFB',
             '#B3E5FC', '#B2EBF2', '#B2DFDB', '#C8E6C9', '#DCEDC8'
-        ]
+        )
+        self.scope_color_cache = {}  # {scope: цвет}
+        self.scope_tags_configured = set()  # scope с настроенным тегом в id_tree
         
         self._setup_ui()
         self._setup_styles()
         self._load_first_example()
+        
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    def _on_close(self):
+        """Закрытие окна: отменить опрос очереди, остановить логгер"""
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self.logger.close()
+        self.root.destroy()
     
     def _setup_ui(self):
         """Настройка интерфейса"""
@@ -305,7 +345,7 @@ class TranslatorGUI:
         self.example_combo = ttk.Combobox(
             example_frame,
             textvariable=self.example_var,
-            values=list(EXAMPLES.keys()),
+            values=EXAMPLE_NAMES,
             state='readonly',
             width=40
         )
@@ -476,9 +516,8 @@ class TranslatorGUI:
     
     def _load_first_example(self):
         """Нагрузить первый пример"""
-        if EXAMPLES:
-            first = list(EXAMPLES.keys())[0]
-            self.example_var.set(first)
+        if EXAMPLE_NAMES:
+            self.example_var.set(EXAMPLE_NAMES[0])
             self._on_example_selected(None)
     
     def _on_example_selected(self, event):
@@ -511,49 +550,97 @@ class TranslatorGUI:
     
     def _log(self, message: str, tag: str = None):
         """Вывести сообщение в консоль"""
+        self._log_lines([(message, tag)])
+    
+    def _log_lines(self, lines: List[Tuple[str, Optional[str]]]):
+        """Вывести пачку сообщений в консоль одной вставкой"""
+        # Text.insert принимает чередующиеся пары (текст, теги)
+        chunks = []
+        for message, tag in lines:
+            chunks.append(message + "\n")
+            chunks.append(tag or ())
         self.console_text.configure(state=tk.NORMAL)
-        if tag:
-            self.console_text.insert(tk.END, message + "\n", tag)
-        else:
-            self.console_text.insert(tk.END, message + "\n")
+        self.console_text.insert(tk.END, *chunks)
         self.console_text.see(tk.END)
         self.console_text.configure(state=tk.DISABLED)
     
     def _analyze_safe(self):
-        """Безопасный вызов анализа с обработкой исключений"""
+        """Запустить анализ в рабочем потоке (интерфейс остаётся отзывчивым)"""
+        if self.worker and self.worker.is_alive():
+            return
+        
         try:
-            log_file = self.logger.start_new_session()
-            self.logger.info(f"Python версия: {sys.version}")
-            self.logger.info(f"Tkinter версия: {tk.TkVersion}")
-            
-            self._analyze()
+            self.logger.start_new_session()
+            self.logger.info("Python версия: %s", sys.version)
+            self.logger.info("Tkinter версия: %s", tk.TkVersion)
+            self.logger.section("НАЧАЛО АНАЛИЗА")
+            self._clear_views()
             
-            self.logger.close()
+            source = self.input_text.get('1.0', tk.END)
+            self.analyze_btn.configure(state=tk.DISABLED)
             
+            self.worker = threading.Thread(
+                target=self._run_pipeline, args=(source,), daemon=True
+            )
+            self.worker.start()
         except Exception as e:
-            self.logger.critical(f"КРИТИЧЕСКАЯ ОШИБКА: {str(e)}")
+            # Ошибка до запуска потока: закрываем лог и показываем диалог
+            self.logger.critical("КРИТИЧЕСКАЯ ОШИБКА: %s", e)
             self.logger.exception("Traceback:")
-            self.logger.close()
-            
-            error_msg = f"Произошла критическая ошибка:\n{str(e)}\n\nЛог сохранен в: {self.logger.current_log_file}"
-            self._log(f"\n✗ КРИТИЧЕСКАЯ ОШИБКА: {str(e)}", 'error')
-            messagebox.showerror("Ошибка", error_msg)
-    
-    def _analyze(self):
-        """Главная функция анализа"""
-        self.logger.section("НАЧАЛО АНАЛИЗА")
-        self._clear_views()
+            self._finish_analysis(AnalysisResult(error=e))
+            return
         
-        source = self.input_text.get('1.0', tk.END)
-        self.logger.info(f"Длина исходного кода: {len(source)} символов")
+        self._poll_id = self.root.after(self.UI_POLL_MS, self._drain_ui_queue)
+    
+    def _run_pipeline(self, source: str):
+        """Рабочий поток: анализ с обработкой исключений"""
+        result = AnalysisResult()
+        try:
+            self._analyze(source, result)
+        except Exception as e:
+            self.logger.critical("КРИТИЧЕСКАЯ ОШИБКА: %s", e)
+            self.logger.exception("Traceback:")
+            result.error = e
+        finally:
+            self.ui_queue.put(result)
+    
+    def _post(self, message: str, tag: str = None):
+        """Передать сообщение для консоли из рабочего потока"""
+        self.ui_queue.put((message, tag))
+    
+    def _drain_ui_queue(self):
+        """Вывести накопленные сообщения; по готовности показать результаты"""
+        lines = []
+        result = None
+        while result is None:
+            try:
+                item = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, AnalysisResult):
+                result = item
+            else:
+                lines.append(item)
+        
+        if lines:
+            self._log_lines(lines)
+        if result is not None:
+            self._poll_id = None
+            self._finish_analysis(result)
+        else:
+            self._poll_id = self.root.after(self.UI_POLL_MS, self._drain_ui_queue)
+    
+    def _analyze(self, source: str, result: AnalysisResult):
+        """Главная функция анализа (выполняется в рабочем потоке)"""
+        self.logger.info("Длина исходного кода: %d символов", len(source))
         
-        self._log("=" * 60)
-        self._log("НАЧАЛО АНАЛИЗА", 'success')
-        self._log("=" * 60)
+        self._post("=" * 60)
+        self._post("НАЧАЛО АНАЛИЗА", 'success')
+        self._post("=" * 60)
         
         # 1. Лексический анализ
         self.logger.section("ЭТАП 1: ЛЕКСИЧЕСКИЙ АНАЛИЗ")
-        self._log("\n[1/5] Лексический анализ...")
+        self._post("\n[1/5] Лексический анализ...")
         
         try:
             self.lexer = Lexer(source)
@@ -561,100 +648,115 @@ class TranslatorGUI:
             tokens = self.lexer.scan()
             
             if self.lexer.errors:
-                self._log("\n✗ Обнаружены лексические ошибки:", 'error')
+                self._post("\n✗ Обнаружены лексические ошибки:", 'error')
                 for error in self.lexer.errors:
-                    self._log(f"  • {error}", 'error')
+                    self._post(f"  • {error}", 'error')
                 return
             
-            self._log(f"✔ Найдено {len(tokens)} токенов", 'success')
-            self._fill_tokens_table(tokens)
-            self._fill_identifier_table()
+            self._post(f"✔ Найдено {len(tokens)} токенов", 'success')
+            result.tokens = tokens
             
         except Exception as e:
-            self.logger.exception(f"Ошибка при лексическом анализе: {str(e)}")
+            self.logger.exception("Ошибка при лексическом анализе: %s", e)
             raise
         
         # 2. Синтаксический анализ
         self.logger.section("ЭТАП 2: СИНТАКСИЧЕСКИЙ АНАЛИЗ")
-        self._log("\n[2/5] Синтаксический анализ...")
+        self._post("\n[2/5] Синтаксический анализ...")
         
         try:
             self.parser = Parser(tokens)
             self.ast = self.parser.parse()
             
             if self.parser.errors:
-                self._log("\n✗ Обнаружены синтаксические ошибки:", 'error')
+                self._post("\n✗ Обнаружены синтаксические ошибки:", 'error')
                 for error in self.parser.errors:
-                    self._log(f"  • {error}", 'error')
+                    self._post(f"  • {error}", 'error')
                 return
             
-            self._log("✔ Синтаксическое дерево построено", 'success')
-            
-            # Отображение дерева используя новые методы AST
-            self._display_ast_text(self.ast)
-            self._display_ast_graph(self.ast)
+            self._post("✔ Синтаксическое дерево построено", 'success')
+            result.ast = self.ast
             
         except Exception as e:
-            self.logger.exception(f"Ошибка при синтаксическом анализе: {str(e)}")
+            self.logger.exception("Ошибка при синтаксическом анализе: %s", e)
             raise
         
         # 3. Оптимизация
         self.logger.section("ЭТАП 3: ОПТИМИЗАЦИЯ")
-        self._log("\n[3/5] Оптимизация...")
+        self._post("\n[3/5] Оптимизация...")
         
         try:
-            optimized_ast = self.optimizer.optimize(self.ast)
-            self._log(f"✔ Применено {self.optimizer.optimizations_applied} оптимизаций", 'success')
+            # Оптимизатор меняет дерево на месте, а на вкладке "Анализ"
+            # показывается дерево до оптимизации
+            optimized_ast = self.optimizer.optimize(copy.deepcopy(self.ast))
+            self._post(f"✔ Применено {self.optimizer.optimizations_applied} оптимизаций", 'success')
         except Exception as e:
-            self.logger.exception(f"Ошибка при оптимизации: {str(e)}")
+            self.logger.exception("Ошибка при оптимизации: %s", e)
             raise
         
         # 4. Генерация кода
         self.logger.section("ЭТАП 4: ГЕНЕРАЦИЯ КОДА")
-        self._log("\n[4/5] Генерация Python 3 кода...")
+        self._post("\n[4/5] Генерация Python 3 кода...")
         
         try:
-            python3_code = self.generator.generate(optimized_ast)
-            
-            self.output_text.configure(state=tk.NORMAL)
-            self.output_text.insert('1.0', python3_code)
-            self.output_text.configure(state=tk.DISABLED)
-            
-            self._log("✔ Код успешно сгенерирован", 'success')
+            result.python3_code = self.generator.generate(optimized_ast)
+            self._post("✔ Код успешно сгенерирован", 'success')
             
         except Exception as e:
-            self.logger.exception(f"Ошибка при генерации кода: {str(e)}")
+            self.logger.exception("Ошибка при генерации кода: %s", e)
             raise
         
         # 5. Завершение
         self.logger.section("ЗАВЕРШЕНИЕ")
         
-        self._log("\n" + "=" * 60)
-        self._log("АНАЛИЗ ЗАВЕРШЕН УСПЕШНО!", 'success')
-        self._log("=" * 60)
+        self._post("\n" + "=" * 60)
+        self._post("АНАЛИЗ ЗАВЕРШЕН УСПЕШНО!", 'success')
+        self._post("=" * 60)
+    
+    def _finish_analysis(self, result: AnalysisResult):
+        """Показать результаты анализа (в потоке Tk)"""
+        try:
+            if result.tokens:
+                self._fill_tokens_table(result.tokens)
+                self._fill_identifier_table()
+            
+            if result.ast:
+                self._display_ast_text(result.ast)
+                self._display_ast_graph(result.ast)
+            
+            if result.python3_code is not None:
+                self.output_text.configure(state=tk.NORMAL)
+                self.output_text.insert('1.0', result.python3_code)
+                self.output_text.configure(state=tk.DISABLED)
+        except Exception as e:
+            self.logger.critical("КРИТИЧЕСКАЯ ОШИБКА: %s", e)
+            self.logger.exception("Traceback:")
+            result.error = e
+        
+        self.logger.close()
+        self.analyze_btn.configure(state=tk.NORMAL)
+        
+        if result.error:
+            error_msg = f"Произошла критическая ошибка:\n{result.error}\n\nЛог сохранен в: {self.logger.current_log_file}"
+            self._log(f"\n✗ КРИТИЧЕСКАЯ ОШИБКА: {result.error}", 'error')
+            messagebox.showerror("Ошибка", error_msg)
     
     def _fill_tokens_table(self, tokens: List[Token]):
         """Заполнить таблицу токенов"""
+        # Прямой вызов Tcl-команды виджета: Treeview.insert на каждой
+        # строке заново разбирает именованные аргументы
+        call = self.tokens_tree.tk.call
+        widget = str(self.tokens_tree)
+        tags = self.TOKEN_TAGS
+        names = TOKEN_TYPE_NAMES
         for token in tokens:
             if token.type == TokenType.EOF:
                 continue
             
-            tag = ''
-            if 'KEYWORD' in token.type.name or token.type.name in ('PRINT', 'DEF', 'CLASS', 'IF', 'WHILE', 'FOR'):
-                tag = 'keyword'
-            elif token.type == TokenType.IDENTIFIER:
-                tag = 'identifier'
-            elif token.type == TokenType.NUMBER:
-                tag = 'number'
-            elif token.type == TokenType.STRING:
-                tag = 'string'
-            elif token.type == TokenType.UNKNOWN:
-                tag = 'error'
-            
-            self.tokens_tree.insert(
-                '', tk.END,
-                values=(token.line, token.column, token.type.name, str(token.value)),
-                tags=(tag,)
+            call(
+                widget, 'insert', '', 'end',
+                '-values', (token.line, token.column, names[token.type], str(token.value)),
+                '-tags', (tags.get(token.type, ''),)
             )
     
     def _fill_identifier_table(self):
@@ -662,34 +764,35 @@ class TranslatorGUI:
         if not self.id_table:
             return
         
-        self._configure_scope_tags()
-        
+        call = self.id_tree.tk.call
+        widget = str(self.id_tree)
+        configured = self.scope_tags_configured
         for entry in self.id_table.get_all_entries():
+            scope = entry.scope
+            scope_tag = f'scope_{scope}'
+            if scope not in configured:
+                # Теги Treeview переживают очистку таблицы, а цвет области
+                # постоянен, поэтому тег настраивается один раз за сеанс
+                configured.add(scope)
+                self.id_tree.tag_configure(scope_tag, background=self._get_scope_color(scope))
+            
             value_str = str(entry.value) if entry.value else "-"
             addr_str = f"({entry.bucket},{entry.pos})"
-            scope_tag = f'scope_{entry.scope}'
-            
-            self.id_tree.insert(
-                '', tk.END,
-                values=(entry.name, entry.scope, entry.kind, entry.type_, value_str, addr_str),
-                tags=(scope_tag,)
+            call(
+                widget, 'insert', '', 'end',
+                '-values', (entry.name, scope, entry.kind, entry.type_, value_str, addr_str),
+                '-tags', (scope_tag,)
             )
     
-    def _configure_scope_tags(self):
-        """Настройка цветов для областей видимости"""
-        if not self.id_table:
-            return
-        
-        scopes = self.id_table.get_all_scopes()
-        for scope in scopes:
-            tag_name = f'scope_{scope}'
-            color = self._get_scope_color(scope)
-            self.id_tree.tag_configure(tag_name, background=color)
-    
     def _get_scope_color(self, scope: str) -> str:
-        """Получить цвет для области видимости"""
-        hash_val = sum(ord(c) for c in scope)
-        return self.scope_colors[hash_val % len(self.scope_colors)]
+        """Получить цвет для области видимости (вычисляется один раз на область)"""
+        color = self.scope_color_cache.get(scope)
+        if color is None:
+            # sum(ord) вместо hash(): цвет области одинаков между запусками
+            hash_val = sum(map(ord, scope))
+            color = self.scope_colors[hash_val % len(self.scope_colors)]
+            self.scope_color_cache[scope] = color
+        return color
     
     def _display_ast_text(self, node: ASTNode):
         """Отобразить AST в текстовом виде
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тесты лексического анализатора: escape-последовательности в строках
+"""
+
+import unittest
+
+from lexer import Lexer, TokenType
+
+
+def _string_values(source: str):
+    """Значения строковых токенов исходного текста"""
+    lexer = Lexer(source)
+    tokens = lexer.scan()
+    assert not lexer.errors, lexer.errors
+    return [token.value for token in tokens if token.type == TokenType.STRING]
+
+
+class TestStringEscapes(unittest.TestCase):
+    """Декодирование escape-последовательностей"""
+
+    def test_known_escapes(self):
+        self.assertEqual(_string_values('x = "a\\n\\t\\r\\\\\\"b"\n'), ['a\n\t\r\\"b'])
+
+    def test_unknown_escape_keeps_backslash(self):
+        self.assertEqual(_string_values('x = "a\\d"\n'), ['a\\d'])
+
+    def test_triple_quoted_known_escapes(self):
+        self.assertEqual(_string_values('x = """a\\n\\"\\"\\"b"""\n'), ['a\n"""b'])
+
+    def test_triple_quoted_unknown_escape_keeps_backslash(self):
+        self.assertEqual(_string_values('x = """a\\d+\\x41"""\n'), ['a\\d+\\x41'])
+
+
+if __name__ == '__main__':
+    unittest.main()